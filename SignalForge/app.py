@@ -1,7 +1,8 @@
 import os, json
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
 from tools.get_ticker_data import get_ticker_data
 from tools.analyze_technical_indicators import analyze_technical_indicators
@@ -21,29 +22,44 @@ with colA:
 with colB:
     run_btn = st.button("Run Analysis")
 
+def _sma(cs: np.ndarray, window: int) -> np.ndarray:
+    # Rolling mean from a prefix-sum array (len N+1), NaN-padded like rolling().mean()
+    out = np.full(len(cs) - 1, np.nan)
+    if len(out) >= window:
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window
+    return out
+
+@st.cache_data(ttl=900)
+def price_sma_frame(ticker: str, as_of: str, _ohlcv: list) -> pd.DataFrame:
+    # Keyed by (ticker, last bar date); the row list itself is not hashed on each rerun
+    df = pd.DataFrame(_ohlcv)
+    if df.empty:
+        return df
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    # One cumulative-sum pass serves both windows
+    c = np.asarray(df["close"], dtype=np.float64)
+    cs = np.concatenate(([0.0], c.cumsum()))
+    df["SMA50"] = _sma(cs, 50)
+    df["SMA200"] = _sma(cs, 200)
+    return df.set_index("date")[["close", "SMA50", "SMA200"]]
+
 def plot_price_sma(df: pd.DataFrame):
-    df = df.copy()
-    df["SMA50"] = df["close"].rolling(50).mean()
-    df["SMA200"] = df["close"].rolling(200).mean()
-    fig, ax = plt.subplots(figsize=(10,4))
-    ax.plot(df["date"], df["close"], label="Close")
-    if df["SMA50"].notna().sum()>0:
-        ax.plot(df["date"], df["SMA50"], label="SMA50")
-    if df["SMA200"].notna().sum()>0:
-        ax.plot(df["date"], df["SMA200"], label="SMA200")
-    ax.legend()
-    ax.set_title("Close with SMA 50/200")
-    st.pyplot(fig)
+    cols = [c for c in ("close", "SMA50", "SMA200") if df[c].notna().any()]
+    st.line_chart(df[cols])
 
 if run_btn:
     with st.spinner("Fetching & analyzing..."):
-        td = get_ticker_data(ticker)
-        ohlcv = td.get("ohlcv", [])
-        tech = analyze_technical_indicators(ticker, ohlcv)
-        fnda = analyze_fundamentals(ticker)
-        opt_raw = get_options_data(ticker, expiries=expiries)
-        opt = analyze_options_data(ticker, opt_raw)
-        sm = analyze_smart_money(ticker)
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            f_td = ex.submit(get_ticker_data, ticker)
+            f_opt_raw = ex.submit(get_options_data, ticker, expiries=expiries)
+            f_fnda = ex.submit(analyze_fundamentals, ticker)
+            f_sm = ex.submit(analyze_smart_money, ticker)
+            td = f_td.result()
+            ohlcv = td.get("ohlcv", [])
+            tech = analyze_technical_indicators(ticker, ohlcv)
+            opt = analyze_options_data(ticker, f_opt_raw.result())
+            fnda = f_fnda.result()
+            sm = f_sm.result()
         final = summarize_insights(ticker, tech, fnda, opt, sm)
 
     st.success("Done.")
@@ -52,7 +68,7 @@ if run_btn:
     st.json(final)
 
     st.header("📊 Price & Moving Averages")
-    df = pd.DataFrame(ohlcv)
+    df = price_sma_frame(ticker, str(ohlcv[-1].get("date")) if ohlcv else "", ohlcv)
     if not df.empty:
         plot_price_sma(df)
     else:
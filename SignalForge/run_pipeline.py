@@ -1,4 +1,5 @@
 import json, sys
+from concurrent.futures import ThreadPoolExecutor
 from tools.get_ticker_data import get_ticker_data
 from tools.analyze_technical_indicators import analyze_technical_indicators
 from tools.analyze_fundamentals import analyze_fundamentals
@@ -8,12 +9,17 @@ from tools.analyze_smart_money import analyze_smart_money
 from tools.summarize_insights import summarize_insights
 
 def run_signal_pipeline(ticker: str):
-    td = get_ticker_data(ticker)
-    tech = analyze_technical_indicators(ticker, td.get("ohlcv", []))
-    fnda = analyze_fundamentals(ticker)
-    opt_raw = get_options_data(ticker)
-    opt = analyze_options_data(ticker, opt_raw)
-    sm = analyze_smart_money(ticker)
+    # The four fetch stages are network-bound and independent; run them concurrently
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_td = ex.submit(get_ticker_data, ticker)
+        f_opt_raw = ex.submit(get_options_data, ticker)
+        f_fnda = ex.submit(analyze_fundamentals, ticker)
+        f_sm = ex.submit(analyze_smart_money, ticker)
+        td = f_td.result()
+        tech = analyze_technical_indicators(ticker, td.get("ohlcv", []))
+        opt = analyze_options_data(ticker, f_opt_raw.result())
+        fnda = f_fnda.result()
+        sm = f_sm.result()
     final = summarize_insights(ticker, tech, fnda, opt, sm)
     return {
         "ticker": ticker,
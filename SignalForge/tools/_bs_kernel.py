@@ -0,0 +1,54 @@
+"""
+Numba Black-Scholes kernel for delta and POP(ITM) over a chain side.
+Uses the Abramowitz-Stegun polynomial for the normal CDF (|error| < 7.5e-8): one exp
+plus a Horner polynomial, and no scipy inside the compiled loop.
+Compiled on first kernels() call; when numba is not installed, HAVE_NUMBA is False and
+get_options_data keeps the NumPy/ndtr path.
+"""
+import math
+import numpy as np
+
+try:
+    from ._njit import HAVE_NUMBA, kernel_loader
+except ImportError:  # running as a script from tools/
+    from _njit import HAVE_NUMBA, kernel_loader
+
+# fastmath without nnan/ninf: invalid rows are reported as NaN and must stay NaN
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+def _phi(d):
+    """Standard normal CDF, Abramowitz & Stegun 26.2.17."""
+    k = 1.0 / (1.0 + 0.2316419 * abs(d))
+    v = 0.39894228040143268 * math.exp(-0.5 * d * d) * (
+        k * (0.31938153 + k * (-0.356563782 + k * (1.781477937 + k * (-1.821255978 + k * 1.330274429)))))
+    return 1.0 - v if d > 0 else v
+
+
+def greeks_vec(S, K, iv, T, sqrtT, sign):
+    """
+    Delta and POP(ITM) arrays for one side; sign=+1 for calls, -1 for puts.
+    sqrtT is sqrt(T), precomputed by the caller once per expiry.
+    Rows with iv outside (0, 5) or a non-positive/non-finite strike are NaN.
+    """
+    n = len(K)
+    delta = np.full(n, np.nan)
+    pop = np.full(n, np.nan)
+    for i in range(n):
+        k = K[i]
+        sigma = iv[i]
+        if not (sigma > 0.0 and sigma < 5.0) or not (np.isfinite(k) and k > 0.0):
+            continue
+        d1 = (math.log(S / k) + 0.5 * sigma * sigma * T) / (sigma * sqrtT + 1e-12)
+        d2 = d1 - sigma * sqrtT
+        nd1 = _phi(d1)
+        delta[i] = nd1 if sign > 0 else nd1 - 1.0
+        pop[i] = _phi(sign * d2)
+    return delta, pop
+
+
+# (_phi, greeks_vec); _phi first since greeks_vec calls it
+kernels = kernel_loader(globals(), [
+    ("_phi", dict(fastmath=_FASTMATH, cache=True)),
+    ("greeks_vec", dict(parallel=False, fastmath=_FASTMATH, cache=True)),
+])
@@ -0,0 +1,73 @@
+"""
+Numba kernels for the indicators used by analyze_technical_indicators.
+Semantics match the `ta` library (adjust=False EWM, min_periods=window, ddof=0 std).
+Compiled on first kernels() call; when numba is not installed, HAVE_NUMBA is False and callers keep using `ta`.
+"""
+import numpy as np
+
+try:
+    from ._njit import HAVE_NUMBA, kernel_loader
+except ImportError:  # running as a script from tools/
+    from _njit import HAVE_NUMBA, kernel_loader
+
+
+def _ewm(x, span):
+    """Recursive EMA with alpha = 2/(span+1), seeded with the first value."""
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(x)
+    out[0] = x[0]
+    for i in range(1, len(x)):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+def _sma(x, w):
+    """Rolling mean via one-in-one-out running sum; NaN until w bars are available."""
+    out = np.full(len(x), np.nan)
+    if len(x) < w:
+        return out
+    s = 0.0
+    for i in range(w):
+        s += x[i]
+    out[w - 1] = s / w
+    for i in range(w, len(x)):
+        s += x[i] - x[i - w]
+        out[i] = s / w
+    return out
+
+
+def _bbands(x, w, k):
+    """Latest (upper, lower) Bollinger bands from running sum and sum of squares."""
+    if len(x) < w:
+        return np.nan, np.nan
+    s = 0.0
+    sq = 0.0
+    for i in range(w):
+        s += x[i]
+        sq += x[i] * x[i]
+    for i in range(w, len(x)):
+        old = x[i - w]
+        s += x[i] - old
+        sq += x[i] * x[i] - old * old
+    mean = s / w
+    var = max(sq / w - mean * mean, 0.0)
+    dev = k * np.sqrt(var)
+    return mean + dev, mean - dev
+
+
+def _macd_diff(x, fast, slow, signal):
+    """Latest MACD histogram (ema_fast - ema_slow - signal); NaN until slow+signal-1 bars."""
+    if len(x) < slow + signal - 1:
+        return np.nan
+    macd = _ewm(x, fast) - _ewm(x, slow)
+    sig = _ewm(macd[slow - 1:], signal)
+    return macd[-1] - sig[-1]
+
+
+# (_ewm, _sma, _bbands, _macd_diff); _ewm first since _macd_diff calls it
+kernels = kernel_loader(globals(), [
+    ("_ewm", dict(cache=True)),
+    ("_sma", dict(cache=True)),
+    ("_bbands", dict(cache=True)),
+    ("_macd_diff", dict(cache=True)),
+])
@@ -0,0 +1,36 @@
+"""
+Deferred numba.njit. numba is optional and costs ~0.25s to import, so kernels are written as plain
+functions and only compiled on first use. HAVE_NUMBA just checks that numba is installed.
+"""
+import importlib.util
+import threading
+
+HAVE_NUMBA = importlib.util.find_spec("numba") is not None
+
+
+def kernel_loader(namespace: dict, specs: list):
+    """
+    Return an accessor that, on first call, replaces each (name, njit_options) function in
+    `namespace` with its numba.njit version and returns the functions in `specs` order.
+    List callees before callers: compiled kernels resolve each other through module globals.
+    Without numba (or if it fails to import) the plain Python functions are returned.
+    """
+    lock = threading.Lock()
+    loaded = []
+
+    def load() -> tuple:
+        if not loaded:
+            with lock:
+                if not loaded:
+                    if HAVE_NUMBA:
+                        try:
+                            from numba import njit
+                        except ImportError:
+                            njit = None
+                        if njit is not None:
+                            for name, options in specs:
+                                namespace[name] = njit(**options)(namespace[name])
+                    loaded.append(True)
+        return tuple(namespace[name] for name, _ in specs)
+
+    return load
@@ -1,28 +1,44 @@
 import os
-import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-from tools.utils_http import fetch_json  # Remove 'tools.' prefix
+from tools.utils_http import fetch_json, yf_ticker  # Remove 'tools.' prefix
 from tools.schemas import FundamentalsOut
+from tools.cache import cached
 from dotenv import load_dotenv
 load_dotenv()
 def _sf(x):
+    # Branch on the common shapes first: already-float, or missing (None / "" / AlphaVantage's "None")
+    if type(x) is float:
+        return x
+    if x is None or x in ("", "None"):
+        return None
     try:
         return float(x)
-    except:
+    except (TypeError, ValueError):
         return None
 
+def _fetch_all_fmp(ticker: str, fmp: str):
+    """Issue the five FMP requests concurrently over the shared session pool."""
+    base = "https://financialmodelingprep.com/api/v3"
+    calls = [
+        (f"{base}/profile/{ticker}", {"apikey": fmp}),
+        (f"{base}/key-metrics-ttm/{ticker}", {"apikey": fmp}),
+        (f"{base}/income-statement/{ticker}", {"period":"annual","limit":1,"apikey": fmp}),
+        (f"{base}/cash-flow-statement/{ticker}", {"period":"annual","limit":1,"apikey": fmp}),
+        (f"{base}/insider-trading", {"symbol":ticker,"apikey":fmp}),
+    ]
+    with ThreadPoolExecutor(max_workers=len(calls)) as ex:
+        futures = [ex.submit(fetch_json, url, params) for url, params in calls]
+        return [f.result() for f in futures]
+
+@cached(ttl_seconds=24 * 3600)
 def analyze_fundamentals(ticker: str) -> Dict[str, Any]:
     fmp = os.getenv("FMP_API_KEY")
     av  = os.getenv("ALPHAVANTAGE_API_KEY")
 
     if fmp:
         try:
-            base = "https://financialmodelingprep.com/api/v3"
-            profile = fetch_json(f"{base}/profile/{ticker}", {"apikey": fmp})
-            key_metrics = fetch_json(f"{base}/key-metrics-ttm/{ticker}", {"apikey": fmp})
-            income = fetch_json(f"{base}/income-statement/{ticker}", {"period":"annual","limit":1,"apikey": fmp})
-            cf = fetch_json(f"{base}/cash-flow-statement/{ticker}", {"period":"annual","limit":1,"apikey": fmp})
-            insiders = fetch_json(f"{base}/insider-trading", {"symbol":ticker,"apikey":fmp})
+            profile, key_metrics, income, cf, insiders = _fetch_all_fmp(ticker, fmp)
 
             prof = profile[0] if isinstance(profile, list) and profile else {}
             km = key_metrics[0] if isinstance(key_metrics, list) and key_metrics else {}
@@ -44,7 +60,7 @@ def analyze_fundamentals(ticker: str) -> Dict[str, Any]:
                 peg_ratio=_sf(km.get("pegRatioTTM") or prof.get("pegRatio")),
                 insider_transactions_count_90d=sum(1 for x in ins if x.get("transactionDate")),
                 forward_guidance=str(prof.get("companyOfficers")) if prof.get("companyOfficers") else None
-            ).dict()
+            ).model_dump(mode="json")
         except Exception:
             pass
 
@@ -64,12 +80,12 @@ def analyze_fundamentals(ticker: str) -> Dict[str, Any]:
                 free_cash_flow_yield=None,
                 peg_ratio=_sf(ov.get("PEGRatio")),
                 forward_guidance=ov.get("AnalystTargetPrice")
-            ).dict()
+            ).model_dump(mode="json")
         except Exception:
             pass
 
     try:
-        tk = yf.Ticker(ticker)
+        tk = yf_ticker(ticker)
         info = tk.info or {}
         return FundamentalsOut(
             source="Yahoo",
@@ -79,9 +95,9 @@ def analyze_fundamentals(ticker: str) -> Dict[str, Any]:
             pe_ratio=_sf(info.get("trailingPE") or info.get("forwardPE")),
             peg_ratio=_sf(info.get("pegRatio")),
             forward_guidance=str(info.get("targetMeanPrice")) if info.get("targetMeanPrice") else None
-        ).dict()
+        ).model_dump(mode="json")
     except Exception as e:
-        return FundamentalsOut(source="none", error=str(e)).dict()
+        return FundamentalsOut(source="none", error=str(e)).model_dump(mode="json")
 
 if __name__ == "__main__":
     import json, sys
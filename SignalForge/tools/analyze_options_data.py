@@ -1,3 +1,5 @@
+import heapq
+import numpy as np
 from typing import Dict, Any, List
 from tools.schemas import OptionsScreenOut, OptionCandidate, OptionsDataOut
 
@@ -6,37 +8,42 @@ def analyze_options_data(ticker: str, options_payload: Dict[str, Any]) -> Dict[s
         od = OptionsDataOut(**options_payload)
         under = od.underlying_price
         if under is None:
-            return OptionsScreenOut(ticker=ticker, error="No underlying price").dict()
+            return OptionsScreenOut(ticker=ticker, error="No underlying price").model_dump(mode="json")
 
-        cands: List[OptionCandidate] = []
-        for oc in od.options:
-            pop = oc.pop_itm
-            last = oc.last or 0.0
-            if pop is None:
-                continue
-
-            if oc.type == "call":
-                distance = max(oc.strike - under, 0.5)
-                max_loss = max(distance, 0.5) * 100
-            else:
-                max_loss = oc.strike * 100
-
-            credit = last * 100
-            ratio = (credit / max_loss) if max_loss > 0 else 0
-            meets = (pop >= 0.65) and (ratio >= 0.33) and (max_loss <= 500)
+        opts = [oc for oc in od.options if oc.pop_itm is not None]
+        if not opts:
+            return OptionsScreenOut(ticker=ticker, candidates=[]).model_dump(mode="json")
+
+        # Score every contract at once; only the top 10 become OptionCandidate models
+        strike = np.array([oc.strike for oc in opts], dtype=np.float64)
+        last = np.array([oc.last or 0.0 for oc in opts], dtype=np.float64)
+        pop = np.array([oc.pop_itm for oc in opts], dtype=np.float64)
+        is_call = np.array([oc.type == "call" for oc in opts])
+        volume = np.array([oc.volume or 0 for oc in opts], dtype=np.float64)
+
+        max_loss = np.where(is_call, np.maximum(strike - under, 0.5) * 100, strike * 100)
+        credit = last * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(max_loss > 0, credit / max_loss, 0.0)
+        meets = (pop >= 0.65) & (ratio >= 0.33) & (max_loss <= 500)
 
+        # Top 10 by (meets, pop, volume) without sorting everything; ties keep input order
+        keys = list(zip(meets.tolist(), pop.tolist(), volume.tolist()))
+        order = heapq.nlargest(10, range(len(opts)), key=keys.__getitem__)
+
+        cands: List[OptionCandidate] = []
+        for i in order:
+            oc = opts[i]
             cands.append(OptionCandidate(
-                type=oc.type, strike=oc.strike, pop_itm=pop,
-                credit=round(credit,2), max_loss=round(max_loss,2),
-                credit_to_max_loss=round(ratio,3), meets_rules=meets,
+                type=oc.type, strike=oc.strike, pop_itm=oc.pop_itm,
+                credit=round(float(credit[i]),2), max_loss=round(float(max_loss[i]),2),
+                credit_to_max_loss=round(float(ratio[i]),3), meets_rules=bool(meets[i]),
                 volume=oc.volume, openInterest=oc.openInterest, expiry=oc.expiry
             ))
-
-        cands.sort(key=lambda x: (x.meets_rules, (x.pop_itm or 0), (x.volume or 0)), reverse=True)
-        return OptionsScreenOut(ticker=ticker, candidates=cands[:10]).dict()
+        return OptionsScreenOut(ticker=ticker, candidates=cands).model_dump(mode="json")
 
     except Exception as e:
-        return OptionsScreenOut(ticker=ticker, error=str(e)).dict()
+        return OptionsScreenOut(ticker=ticker, error=str(e)).model_dump(mode="json")
 
 if __name__ == "__main__":
     import json, sys
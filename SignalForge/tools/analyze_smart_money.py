@@ -1,53 +1,70 @@
 import os
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Any
-from tools.utils_http import fetch_json
+from tools.utils_http import fetch_json, yf_ticker
 from tools.schemas import SmartMoneyOut
+from tools.cache import cached
 
+# Leading word of Yahoo's insider transaction label -> trade direction (gifts, awards, exercises -> 0)
+_TRANSACTION_SIGN = {"purchase": 1, "buy": 1, "bought": 1, "sale": -1, "sell": -1, "sold": -1}
+
+@cached(ttl_seconds=24 * 3600)
 def analyze_smart_money(ticker: str) -> Dict[str, Any]:
-    out = SmartMoneyOut(ticker=ticker).dict()
+    out = {}
+    attempted, failed = 0, []
+    tk = yf_ticker(ticker)
 
+    attempted += 1
     try:
-        tk = yf.Ticker(ticker)
         itx = tk.insider_transactions
         net = 0
         if itx is not None and not itx.empty:
-            itx = itx.reset_index().rename(columns=str.lower)
+            # yfinance labels columns like "Start Date"; normalize to "startdate"
+            itx = itx.reset_index().rename(columns=lambda c: str(c).lower().replace(" ", ""))
             itx["startdate"] = pd.to_datetime(itx["startdate"], errors="coerce", utc=True)
-            cutoff = datetime.utcnow() - timedelta(days=90)
+            cutoff = pd.Timestamp.now(tz="UTC") - timedelta(days=90)
             recent = itx[itx["startdate"] >= cutoff]
-            for _, r in recent.iterrows():
-                shares = int(r.get("shares") or 0)
-                trans = str(r.get("transaction", "")).lower()
-                if "buy" in trans:
-                    net += shares
-                elif "sell" in trans:
-                    net -= shares
+            # Yahoo often leaves "Transaction" blank and puts "Sale at price ..." in "Text"
+            label = recent["transaction"].fillna("").astype(str)
+            if "text" in recent.columns:
+                label = label.where(label.str.strip() != "", recent["text"].fillna("").astype(str))
+            word = label.str.lower().str.split(n=1).str[0]
+            sign = word.map(_TRANSACTION_SIGN).fillna(0).astype(np.int8)
+            shares = pd.to_numeric(recent["shares"], errors="coerce").fillna(0).astype(np.int64)
+            net = int((sign.to_numpy(np.int64) * shares.to_numpy()).sum())
         out["insider_90d_net_buy"] = net
-    except Exception:
-        pass
+    except Exception as e:
+        failed.append(f"insider_transactions: {e}")
 
+    attempted += 1
     try:
-        inst = yf.Ticker(ticker).institutional_holders
+        inst = tk.institutional_holders
         if inst is not None and not inst.empty:
             inst = inst.sort_values("Date Reported", ascending=False).head(10)
             out["institutional_holders"] = inst.to_dict(orient="records")
-    except Exception:
-        pass
+    except Exception as e:
+        failed.append(f"institutional_holders: {e}")
 
     qk = os.getenv("QUANT_API_KEY")
     if qk:
+        attempted += 1
         try:
             js = fetch_json(f"https://api.quiverquant.com/beta/historical/congresstrading/{ticker}", headers={"Authorization": f"Token {qk}"})
             cutoff = (datetime.utcnow() - timedelta(days=30)).date()
             recent = [x for x in js if x.get("TransactionDate") and x["TransactionDate"] >= str(cutoff)]
             out["congress_trades_30d"] = recent[:20]
-        except Exception:
-            pass
+        except Exception as e:
+            failed.append(f"congress_trades: {e}")
+
+    # Every source failing is a fetch problem (rate limit, network), not "no activity";
+    # report it so the result is not cached as an empty success
+    if len(failed) == attempted:
+        out["error"] = "All smart-money lookups failed: " + "; ".join(failed)
 
-    return out
+    # Serialize once at the boundary (holder records carry Timestamps)
+    return SmartMoneyOut(ticker=ticker, **out).model_dump(mode="json")
 
 if __name__ == "__main__":
     import json, sys
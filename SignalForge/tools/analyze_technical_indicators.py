@@ -1,36 +1,37 @@
 import os
 import sys
+import functools
+import threading
+from collections import deque
 import pandas as pd
 import numpy as np
 from typing import Dict, Any
-from ta.trend import MACD, SMAIndicator
-from ta.volatility import BollingerBands
 
 # ---- Robust import for schemas.TechnicalsOut ----
 try:
     from schemas import TechnicalsOut  # running from tools/ directory
+    from _indicators_njit import HAVE_NUMBA, kernels as _kernels
+    from utils_http import normalize_hist
 except Exception:
     try:
         from tools.schemas import TechnicalsOut  # running from project root
+        from tools._indicators_njit import HAVE_NUMBA, kernels as _kernels
+        from tools.utils_http import normalize_hist
     except Exception:  # last resort: patch sys.path
         here = os.path.dirname(os.path.abspath(__file__))
         root = os.path.dirname(here)
         if root not in sys.path:
             sys.path.append(root)
         from tools.schemas import TechnicalsOut  # type: ignore
-
-# Optional yfinance fallback fetch
-try:
-    import yfinance as yf
-except Exception:
-    yf = None
-
+        from tools._indicators_njit import HAVE_NUMBA, kernels as _kernels  # type: ignore
+        from tools.utils_http import normalize_hist  # type: ignore
 
 def _debug(msg: str):
     if os.getenv("SIGNALFORGE_DEBUG"):
         print(f"[analyze_technical_indicators] {msg}")
 
 
+@functools.lru_cache(maxsize=1)
 def _import_get_ticker_data():
     """Try several import paths for get_ticker_data depending on how the script is invoked."""
     try:
@@ -51,37 +52,27 @@ def _import_get_ticker_data():
                 return None
 
 
-def _yf_fetch_ohlcv(ticker: str):
-    if yf is None:
+# Resolved once at import; the lookup cascade raises ImportErrors on the way
+_GET_TICKER_DATA = _import_get_ticker_data()
+
+
+def _yf_fetch_ohlcv(ticker: str, period: str = "max", interval: str = "1d"):
+    # Optional yfinance fallback fetch; imported lazily to keep module import cheap
+    try:
+        import yfinance as yf
+    except ImportError:
         return []
     try:
-        hist = yf.download(ticker, period="6mo", interval="1d", auto_adjust=True, progress=False)
+        hist = yf.download(ticker, period=period, interval=interval, auto_adjust=True, progress=False)
         if hist is None or hist.empty:
             return []
-        df = hist.reset_index()
-        df.columns = [str(c).lower() for c in df.columns]
-        if "adj close" in df.columns:
-            df = df.rename(columns={"adj close": "adj_close"})
-        if "datetime" in df.columns and "date" not in df.columns:
-            df = df.rename(columns={"datetime": "date"})
-        # Enforce numerics before building rows
-        for c in ["open", "high", "low", "close", "adj_close", "volume"]:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df[c], errors="coerce")
+        df = normalize_hist(hist)
         # Drop any rows lacking close
         df = df.dropna(subset=["close"]).reset_index(drop=True)
-        rows = []
-        for r in df.itertuples(index=False):
-            rows.append({
-                "date": getattr(r, "date", None),
-                "open": float(getattr(r, "open", np.nan)) if not pd.isna(getattr(r, "open", np.nan)) else None,
-                "high": float(getattr(r, "high", np.nan)) if not pd.isna(getattr(r, "high", np.nan)) else None,
-                "low": float(getattr(r, "low", np.nan)) if not pd.isna(getattr(r, "low", np.nan)) else None,
-                "close": float(getattr(r, "close", np.nan)) if not pd.isna(getattr(r, "close", np.nan)) else None,
-                "adj_close": float(getattr(r, "adj_close", np.nan)) if hasattr(r, "adj_close") and not pd.isna(getattr(r, "adj_close", np.nan)) else None,
-                "volume": float(getattr(r, "volume", np.nan)) if not pd.isna(getattr(r, "volume", np.nan)) else None,
-            })
-        return rows
+        # Build rows in one pass; object dtype so missing values come out as None, not NaN
+        num = ["open", "high", "low", "close", "adj_close", "volume"]
+        df = df.reindex(columns=["date"] + num).astype({c: np.float64 for c in num}).astype(object)
+        return df.where(df.notna(), None).to_dict(orient="records")
     except Exception as e:
         _debug(f"yfinance fallback error: {e}")
         return []
@@ -160,11 +151,130 @@ def _ensure_close_column(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+# Only the latest values are reported, so indicators only need a bounded tail of history:
+# 200 bars for SMA200 plus warm-up so the EMA12/26/signal seeds decay below ~1e-8.
+_MAX_WINDOW = 250
+
+
+def _compute_latest(df: pd.DataFrame):
+    """Full-history indicator pass. Returns (macd_diff, sma50, sma200, bb_upper, bb_lower) latest values."""
+    macd_diff = None
+    sma50_last = sma200_last = np.nan
+    h = l = np.nan
+    if HAVE_NUMBA:
+        # Compiled kernels return only the latest values we report
+        _ewm, _sma, _bbands, _macd_diff = _kernels()
+        close = df["close"].to_numpy(dtype=np.float64)
+        if len(close) >= 26:
+            macd_diff = float(_macd_diff(close, 12, 26, 9))
+        if len(close) >= 50:
+            sma50_last = _sma(close, 50)[-1]
+        if len(close) >= 200:
+            sma200_last = _sma(close, 200)[-1]
+        if len(close) >= 20:
+            h, l = _bbands(close, 20, 2.0)
+    else:
+        from ta.trend import MACD, SMAIndicator
+        from ta.volatility import BollingerBands
+        if len(df) >= 26:
+            macd = MACD(df["close"])
+            macd_diff = float(macd.macd_diff().iloc[-1])
+        if len(df) >= 50:
+            sma50_last = SMAIndicator(df["close"], window=50).sma_indicator().iloc[-1]
+        if len(df) >= 200:
+            sma200_last = SMAIndicator(df["close"], window=200).sma_indicator().iloc[-1]
+        if len(df) >= 20:
+            bb = BollingerBands(df["close"], window=20, window_dev=2)
+            h = bb.bollinger_hband().iloc[-1]
+            l = bb.bollinger_lband().iloc[-1]
+    return macd_diff, sma50_last, sma200_last, h, l
+
+
+# ---- Streaming state: successive calls only pay O(1) per newly appended bar ----
+
+_A12, _A26, _A9 = 2.0 / 13.0, 2.0 / 27.0, 2.0 / 10.0
+_STREAM_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=256)
+def _stream_state(ticker: str) -> dict:
+    """Per-ticker rolling indicator state (running sums, EMAs, last 200 closes)."""
+    return {}
+
+
+def _resume_index(state: dict, df: pd.DataFrame):
+    """Index of the first bar not yet folded into `state`, or None if it must be rebuilt."""
+    if not state or "date" not in df.columns:
+        return None
+    hits = np.flatnonzero(df["date"].to_numpy() == state["last_date"])
+    if not len(hits) or df["close"].iat[hits[-1]] != state["last_close"]:
+        return None
+    start = int(hits[-1]) + 1
+    # The frame reaches further back than the state has seen, and the state is still short
+    # of a full window: those earlier bars would change SMA200/EMA seeds, so rebuild
+    if start > state["n"] and state["n"] < _MAX_WINDOW:
+        return None
+    return start
+
+
+def _seed_state(state: dict, df: pd.DataFrame, close: np.ndarray):
+    state.clear()
+    if "date" not in df.columns or pd.isna(df["date"].iat[-1]):
+        return
+    _ewm = _kernels()[0]
+    ema12, ema26 = _ewm(close, 12), _ewm(close, 26)
+    tail = close[-200:]
+    state.update(
+        n=len(df),
+        tail=deque(tail.tolist(), maxlen=200),
+        sum20=float(tail[-20:].sum()),
+        sumsq20=float((tail[-20:] ** 2).sum()),
+        sum50=float(tail[-50:].sum()),
+        sum200=float(tail.sum()),
+        ema12=float(ema12[-1]),
+        ema26=float(ema26[-1]),
+        signal=float(_ewm((ema12 - ema26)[25:], 9)[-1]) if len(close) >= 26 else None,
+        last_date=df["date"].iat[-1],
+        last_close=float(close[-1]),
+    )
+
+
+def _advance_state(state: dict, x: float):
+    tail = state["tail"]
+    for w, key in ((20, "sum20"), (50, "sum50"), (200, "sum200")):
+        state[key] += x - (tail[-w] if len(tail) >= w else 0.0)
+    state["sumsq20"] += x * x - (tail[-20] ** 2 if len(tail) >= 20 else 0.0)
+    tail.append(x)
+    state["ema12"] = _A12 * x + (1.0 - _A12) * state["ema12"]
+    state["ema26"] = _A26 * x + (1.0 - _A26) * state["ema26"]
+    state["n"] += 1
+    macd = state["ema12"] - state["ema26"]
+    if state["n"] == 26:
+        state["signal"] = macd
+    elif state["n"] > 26:
+        state["signal"] = _A9 * macd + (1.0 - _A9) * state["signal"]
+
+
+def _latest_from_state(state: dict):
+    n = state["n"]
+    macd_diff = None
+    if n >= 26:
+        macd_diff = state["ema12"] - state["ema26"] - state["signal"] if n >= 34 else np.nan
+    sma50_last = state["sum50"] / 50 if n >= 50 else np.nan
+    sma200_last = state["sum200"] / 200 if n >= 200 else np.nan
+    h = l = np.nan
+    if n >= 20:
+        mean = state["sum20"] / 20
+        dev = 2.0 * np.sqrt(max(state["sumsq20"] / 20 - mean * mean, 0.0))
+        h, l = mean + dev, mean - dev
+    return macd_diff, sma50_last, sma200_last, h, l
+
+
 def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
     try:
         # If caller passed nothing, try to fetch OHLCV via our tool
         if not ohlcv:
-            get_ticker = _import_get_ticker_data()
+            get_ticker = _GET_TICKER_DATA
             if get_ticker is not None:
                 try:
                     td = get_ticker(ticker)
@@ -173,9 +283,12 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
                 except Exception as e:
                     _debug(f"get_ticker_data call failed: {e}")
 
-        # If still nothing, try direct yfinance fetch as last resort
+        # If still nothing, try direct yfinance fetch as last resort.
+        # At most one direct fetch per call: "max" covers every shorter period.
+        yf_tried = False
         if not ohlcv:
             ohlcv = _yf_fetch_ohlcv(ticker)
+            yf_tried = True
 
         if not ohlcv:
             return TechnicalsOut(
@@ -185,28 +298,20 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
                 sma_cross=None,
                 bollinger_band_width=None,
                 error="No OHLCV"
-            ).dict()
+            ).model_dump(mode="json")
 
         # Build DataFrame and normalize
-        df = pd.DataFrame([r if isinstance(r, dict) else r.dict() for r in ohlcv])
+        df = pd.DataFrame([r if isinstance(r, dict) else r.model_dump() for r in ohlcv])
         df = _ensure_close_column(df)
 
         if "close" not in df.columns or df["close"].isna().all():
             _debug(f"No usable close values after normalization. Columns: {list(df.columns)}")
-            # Final attempt: direct yfinance 1y/1d fetch and rebuild df
-            if yf is not None:
-                try:
-                    hist3 = yf.download(ticker, period="1y", interval="1d", auto_adjust=True, progress=False)
-                    if hist3 is not None and not hist3.empty:
-                        d3 = hist3.reset_index()
-                        d3.columns = [str(c).lower() for c in d3.columns]
-                        if "adj close" in d3.columns:
-                            d3 = d3.rename(columns={"adj close": "adj_close"})
-                        if "datetime" in d3.columns and "date" not in d3.columns:
-                            d3 = d3.rename(columns={"datetime": "date"})
-                        df = _ensure_close_column(d3)
-                except Exception as e:
-                    _debug(f"final yfinance fetch failed: {e}")
+            # Final attempt: direct yfinance fetch and rebuild df
+            if not yf_tried:
+                rows = _yf_fetch_ohlcv(ticker)
+                yf_tried = True
+                if rows:
+                    df = _ensure_close_column(pd.DataFrame(rows))
 
         # If still no close, bail
         if "close" not in df.columns or df["close"].isna().all():
@@ -218,13 +323,13 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
                 sma_cross=None,
                 bollinger_band_width=None,
                 error="No close prices available"
-            ).dict()
+            ).model_dump(mode="json")
 
         df = df.dropna(subset=["close"]).reset_index(drop=True)
 
         # If too few rows, try to fetch more history and avoid failing
         if len(df) < 30:
-            get_ticker = _import_get_ticker_data()
+            get_ticker = _GET_TICKER_DATA
             if get_ticker is not None:
                 try:
                     td_more = None
@@ -235,26 +340,18 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
                     if isinstance(td_more, dict):
                         more = td_more.get("ohlcv", [])
                         if more:
-                            df_more = pd.DataFrame([r if isinstance(r, dict) else r.dict() for r in more])
+                            df_more = pd.DataFrame([r if isinstance(r, dict) else r.model_dump() for r in more])
                             df = _ensure_close_column(df_more)
                             df = df.dropna(subset=["close"]).reset_index(drop=True)
                 except Exception as e:
                     _debug(f"extended get_ticker_data failed: {e}")
 
-            if len(df) < 30 and yf is not None:
-                try:
-                    hist2 = yf.download(ticker, period="max", interval="1d", auto_adjust=True, progress=False)
-                    if hist2 is not None and not hist2.empty:
-                        d2 = hist2.reset_index()
-                        d2.columns = [str(c).lower() for c in d2.columns]
-                        if "adj close" in d2.columns:
-                            d2 = d2.rename(columns={"adj close": "adj_close"})
-                        if "datetime" in d2.columns and "date" not in d2.columns:
-                            d2 = d2.rename(columns={"datetime": "date"})
-                        df = _ensure_close_column(d2)
-                        df = df.dropna(subset=["close"]).reset_index(drop=True)
-                except Exception as e:
-                    _debug(f"yfinance MAX fetch failed: {e}")
+            if len(df) < 30 and not yf_tried:
+                rows = _yf_fetch_ohlcv(ticker)
+                yf_tried = True
+                if rows:
+                    df = _ensure_close_column(pd.DataFrame(rows))
+                    df = df.dropna(subset=["close"]).reset_index(drop=True)
 
             if len(df) < 5:
                 return TechnicalsOut(
@@ -264,30 +361,35 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
                     sma_cross=None,
                     bollinger_band_width=None,
                     error=f"Not enough bars ({len(df)})"
-                ).dict()
+                ).model_dump(mode="json")
 
         # ---- Compute indicators (tolerant to shorter history) ----
-        macd_diff = None
-        if len(df) >= 26:
-            macd = MACD(df["close"])
-            macd_diff = float(macd.macd_diff().iloc[-1])
-        else:
+        close = df["close"].to_numpy(dtype=np.float64)
+        with _STREAM_LOCK:
+            state = _stream_state(ticker.upper())
+            start = _resume_index(state, df)
+            if start is None:
+                macd_diff, sma50_last, sma200_last, h, l = _compute_latest(df.iloc[-_MAX_WINDOW:])
+                _seed_state(state, df, close[-_MAX_WINDOW:])
+            else:
+                # Same history as last call plus (possibly zero) new bars
+                for x in close[start:]:
+                    _advance_state(state, float(x))
+                state["last_date"] = df["date"].iat[-1]
+                state["last_close"] = float(close[-1])
+                macd_diff, sma50_last, sma200_last, h, l = _latest_from_state(state)
+                if macd_diff is not None:
+                    macd_diff = float(macd_diff)
+        if len(df) < 26:
             _debug("Insufficient bars for MACD (need ~26)")
 
-        sma50 = SMAIndicator(df["close"], window=50).sma_indicator() if len(df)>=50 else pd.Series([np.nan]*len(df))
-        sma200 = SMAIndicator(df["close"], window=200).sma_indicator() if len(df)>=200 else pd.Series([np.nan]*len(df))
-        bb = BollingerBands(df["close"], window=20, window_dev=2) if len(df)>=20 else None
-
         latest = df.iloc[-1]
         sma_cross = None
-        if len(df)>=200 and not np.isnan(sma50.iloc[-1]) and not np.isnan(sma200.iloc[-1]):
-            sma_cross = "golden" if sma50.iloc[-1] > sma200.iloc[-1] else "death"
+        if len(df)>=200 and not np.isnan(sma50_last) and not np.isnan(sma200_last):
+            sma_cross = "golden" if sma50_last > sma200_last else "death"
         band_width = None
-        if bb is not None:
-            h = bb.bollinger_hband().iloc[-1]
-            l = bb.bollinger_lband().iloc[-1]
-            if pd.notna(h) and pd.notna(l):
-                band_width = float(h - l)
+        if pd.notna(h) and pd.notna(l):
+            band_width = float(h - l)
 
         latest_block = {
             "date": str(latest["date"]) if "date" in latest else None,
@@ -301,7 +403,7 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
             macd_diff=macd_diff,
             sma_cross=sma_cross,
             bollinger_band_width=band_width
-        ).dict()
+        ).model_dump(mode="json")
 
     except Exception as e:
         return TechnicalsOut(
@@ -311,13 +413,13 @@ def analyze_technical_indicators(ticker: str, ohlcv: list) -> Dict[str, Any]:
             sma_cross=None,
             bollinger_band_width=None,
             error=str(e)
-        ).dict()
+        ).model_dump(mode="json")
 
 
 if __name__ == "__main__":
     import json
     t = sys.argv[1] if len(sys.argv) > 1 else "AAPL"
-    get_ticker = _import_get_ticker_data()
+    get_ticker = _GET_TICKER_DATA
     if get_ticker:
         td = get_ticker(t)
         ohlcv = td.get("ohlcv", []) if isinstance(td, dict) else []
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+import hashlib
+import inspect
+import functools
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+DEFAULT_CACHE_DIR = ".cache"
+
+
+def _debug(msg: str):
+    if os.getenv("SIGNALFORGE_DEBUG"):
+        print(f"[cache] {msg}")
+
+
+class FileCache:
+    """
+    JSON file cache laid out as <root>/<fn>/<ticker>_<md5(params)>.json.
+    Each entry embeds a `fetched_at` timestamp checked against the caller's TTL.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("SIGNALFORGE_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+    @staticmethod
+    def key(params: dict) -> str:
+        return hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+    def path(self, fn: str, ticker: str, params: dict) -> str:
+        safe = "".join(ch if ch.isalnum() or ch in "-._" else "_" for ch in str(ticker).upper())
+        return os.path.join(self.root, fn, f"{safe}_{self.key(params)}.json")
+
+    def get(self, fn: str, ticker: str, params: dict, ttl_seconds: float) -> Optional[Any]:
+        p = self.path(fn, ticker, params)
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - float(entry.get("fetched_at", 0)) > ttl_seconds:
+            return None
+        return entry.get("value")
+
+    def set(self, fn: str, ticker: str, params: dict, value: Any) -> None:
+        p = self.path(fn, ticker, params)
+        try:
+            os.makedirs(os.path.dirname(p), exist_ok=True)
+            # Write to a temp file then rename so concurrent readers never see a partial entry
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(p), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": time.time(), "value": value}, f, default=str)
+            os.replace(tmp, p)
+        except OSError as e:
+            _debug(f"write failed for {p}: {e}")
+
+
+_default_cache = FileCache()
+
+
+def cached(ttl_seconds: float, cache: Optional[FileCache] = None,
+           memory_ttl: float = 0, memory_maxsize: int = 512) -> Callable:
+    """
+    Cache a tool's dict result on disk for `ttl_seconds`, keyed by (function, ticker, params).
+    The first argument is taken as the ticker. Results carrying an `error` are not stored, so
+    tools must set `error` when every upstream lookup failed rather than return an empty result.
+    With `memory_ttl` > 0, results are also kept in process for that long so repeated calls
+    (e.g. dashboard reruns) skip the disk read; those hits return the same dict, so treat it as read-only.
+    Set SIGNALFORGE_NO_CACHE to bypass the cache entirely.
+    """
+    def decorator(fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+        memo: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if os.getenv("SIGNALFORGE_NO_CACHE"):
+                return fn(*args, **kwargs)
+            store = cache or _default_cache
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            ticker = str(params.pop(next(iter(sig.parameters)))).upper()
+
+            mkey = (ticker, store.key(params))
+            if memory_ttl > 0:
+                with lock:
+                    hit = memo.get(mkey)
+                    if hit is not None and time.monotonic() - hit[0] < memory_ttl:
+                        memo.move_to_end(mkey)
+                        return hit[1]
+
+            out = store.get(fn.__name__, ticker, params, ttl_seconds)
+            if out is not None:
+                _debug(f"hit {fn.__name__} {ticker} {params}")
+            else:
+                out = fn(*args, **kwargs)
+                if not (isinstance(out, dict) and not out.get("error")):
+                    return out
+                store.set(fn.__name__, ticker, params, out)
+
+            if memory_ttl > 0:
+                with lock:
+                    memo[mkey] = (time.monotonic(), out)
+                    memo.move_to_end(mkey)
+                    while len(memo) > memory_maxsize:
+                        memo.popitem(last=False)
+            return out
+
+        wrapper.cache_clear = memo.clear
+        return wrapper
+
+    return decorator
+
+
+def memoize(ttl_seconds: float, maxsize: int = 256) -> Callable:
+    """
+    In-process LRU memo whose entries expire after `ttl_seconds`.
+    Arguments must be hashable. Safe to share across the pipeline's worker threads.
+    """
+    def decorator(fn: Callable) -> Callable:
+        store: "OrderedDict[Any, tuple]" = OrderedDict()
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                hit = store.get(key)
+                if hit is not None and now - hit[0] < ttl_seconds:
+                    store.move_to_end(key)
+                    return hit[1]
+            value = fn(*args, **kwargs)
+            with lock:
+                store[key] = (now, value)
+                store.move_to_end(key)
+                while len(store) > maxsize:
+                    store.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = store.clear
+        return wrapper
+
+    return decorator
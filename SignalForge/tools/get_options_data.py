@@ -1,122 +1,90 @@
 import os
 import io
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, List, Optional
 
 import numpy as np
 import pandas as pd
-import yfinance as yf
-import requests
-from math import sqrt, erf
 
 # Schemas
 try:
-    from schemas import OptionsDataOut, OptionContract
+    from schemas import OptionsDataOut
+    from cache import cached
+    from utils_http import SESSION, normalize_hist, yf_ticker
+    from _bs_kernel import HAVE_NUMBA, kernels as _bs_kernels
 except Exception:
-    from tools.schemas import OptionsDataOut, OptionContract  # type: ignore
+    from tools.schemas import OptionsDataOut  # type: ignore
+    from tools.cache import cached  # type: ignore
+    from tools.utils_http import SESSION, normalize_hist, yf_ticker  # type: ignore
+    from tools._bs_kernel import HAVE_NUMBA, kernels as _bs_kernels  # type: ignore
 
 
 # ---------------- Helpers: normal CDF & Greeks-lite ----------------
 
-def _phi(x):
-    return 0.5 * (1.0 + erf(x / sqrt(2.0)))
-
-
-def _bs_d1(S, K, sigma, T):
-    denom = sigma * sqrt(T)
-    if denom <= 0:
-        return np.nan
-    return (np.log(S / K) + 0.5 * sigma * sigma * T) / (denom + 1e-12)
-
-
-def _delta_call(S, K, sigma, T):
-    if sigma is None or sigma <= 0 or T <= 0:
-        return None
-    d1 = _bs_d1(S, K, sigma, T)
-    if np.isnan(d1):
-        return None
-    return float(_phi(d1))
-
-
-def _delta_put(S, K, sigma, T):
-    if sigma is None or sigma <= 0 or T <= 0:
-        return None
-    d1 = _bs_d1(S, K, sigma, T)
-    if np.isnan(d1):
-        return None
-    return float(_phi(d1) - 1)
+def _bs_d1(S, K, sigma, T, sqrtT):
+    """Black-Scholes d1; elementwise on NumPy arrays. sqrtT is sqrt(T), computed once per expiry."""
+    return (np.log(S / K) + 0.5 * sigma * sigma * T) / (sigma * sqrtT + 1e-12)
+
+
+def _greeks(S, K, iv, T, sqrtT, is_call):
+    """
+    Delta and POP(ITM) for a whole side of the chain in one NumPy pass.
+    Rows with iv outside (0, 5) or a non-positive/non-finite strike come back as NaN.
+    """
+    valid = (iv > 0) & (iv < 5.0) & np.isfinite(K) & (K > 0)
+    sigma = np.where(valid, iv, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1 = _bs_d1(S, K, sigma, T, sqrtT)
+        d2 = d1 - sigma * sqrtT
+    # Standard normal CDF: scipy's C ufunc. Imported here so scipy stays off the import path
+    from scipy.special import ndtr as _phi
+    nd1 = _phi(d1)
+    if is_call:
+        return nd1, _phi(d2)
+    return nd1 - 1.0, _phi(-d2)
+
+
+def _num(x):
+    return None if np.isnan(x) else float(x)
+
+
+def _price_from_history(tk) -> Optional[float]:
+    hist = tk.history(period="5d", interval="1d", auto_adjust=True, actions=False)
+    df = normalize_hist(hist)
+    if not df.empty:
+        s = df['close'] if 'close' in df.columns else df.get('adj_close')
+        if s is not None and s.notna().any():
+            return float(s.dropna().iloc[-1])
+    return None
 
 
-def _pop_itm_call(S, K, sigma, T):
-    if sigma is None or sigma <= 0 or T <= 0:
-        return None
-    d2 = _bs_d1(S, K, sigma, T) - sigma * sqrt(T)
-    if np.isnan(d2):
-        return None
-    return float(_phi(d2))
+def _price_from_download(ticker: str) -> Optional[float]:
+    import yfinance as yf
+    d = yf.download(ticker, period="5d", interval="1d", auto_adjust=True, progress=False)
+    df = normalize_hist(d)
+    if not df.empty and 'close' in df.columns and df['close'].notna().any():
+        return float(df['close'].dropna().iloc[-1])
+    if not df.empty and 'adj_close' in df.columns and df['adj_close'].notna().any():
+        return float(df['adj_close'].dropna().iloc[-1])
+    return None
 
 
-def _pop_itm_put(S, K, sigma, T):
-    if sigma is None or sigma <= 0 or T <= 0:
-        return None
-    d2 = _bs_d1(S, K, sigma, T) - sigma * sqrt(T)
-    if np.isnan(d2):
-        return None
-    return float(_phi(-d2))
-
-
-# ---------------- Normalization helpers ----------------
-
-def _flatten_hist(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize yfinance history/download frames and flatten MultiIndex columns."""
-    if df is None or df.empty:
-        return pd.DataFrame()
-    df = df.reset_index()
-    # Flatten MultiIndex like ('Close','AAPL') -> 'close'
-    if isinstance(df.columns, pd.MultiIndex):
-        new_cols = []
-        for col in df.columns:
-            left = str(col[0]).lower() if isinstance(col, tuple) else str(col).lower()
-            if left == 'adj close':
-                new_cols.append('adj_close')
-            elif left in ('date', 'datetime'):
-                new_cols.append('date')
-            else:
-                new_cols.append(left)
-        df.columns = new_cols
-    else:
-        df.columns = [str(c).lower() for c in df.columns]
-    if 'adj close' in df.columns:
-        df = df.rename(columns={'adj close': 'adj_close'})
-    if 'datetime' in df.columns and 'date' not in df.columns:
-        df = df.rename(columns={'datetime': 'date'})
-    # Numeric coercion
-    for c in ['open','high','low','close','adj_close','volume']:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors='coerce')
-    return df
-
-
-def _last_price_from_history(tk: yf.Ticker, ticker: str) -> Optional[float]:
-    # 1) Ticker.history (5d/1d)
+def _last_price_from_history(tk, ticker: str) -> Optional[float]:
+    # 1+2) Ticker.history and yf.download (5d/1d) raced; first usable price wins
+    ex = ThreadPoolExecutor(max_workers=2)
+    futures = [ex.submit(_price_from_history, tk), ex.submit(_price_from_download, ticker)]
     try:
-        hist = tk.history(period="5d", interval="1d", auto_adjust=True, actions=False)
-        df = _flatten_hist(hist)
-        if not df.empty:
-            s = df['close'] if 'close' in df.columns else df.get('adj_close')
-            if s is not None and s.notna().any():
-                return float(s.dropna().iloc[-1])
-    except Exception:
-        pass
-    # 2) yf.download (5d/1d)
-    try:
-        d = yf.download(ticker, period="5d", interval="1d", auto_adjust=True, progress=False)
-        df = _flatten_hist(d)
-        if not df.empty and 'close' in df.columns and df['close'].notna().any():
-            return float(df['close'].dropna().iloc[-1])
-        if not df.empty and 'adj_close' in df.columns and df['adj_close'].notna().any():
-            return float(df['adj_close'].dropna().iloc[-1])
-    except Exception:
-        pass
+        for fut in as_completed(futures):
+            try:
+                price = fut.result()
+            except Exception:
+                continue
+            if price is not None:
+                return price
+    finally:
+        # Don't block on the slower source once we have an answer
+        ex.shutdown(wait=False, cancel_futures=True)
     # 3) fast_info / info
     try:
         fi = getattr(tk, 'fast_info', {}) or {}
@@ -146,9 +114,10 @@ def _last_price_from_history(tk: yf.Ticker, ticker: str) -> Optional[float]:
                 "datatype": "csv",
                 "apikey": key,
             }
-            r = requests.get(url, params=params, timeout=20)
+            r = SESSION.get(url, params=params, timeout=20)
             r.raise_for_status()
-            df = pd.read_csv(io.StringIO(r.text))
+            # Parse the raw bytes and only the price columns (a callable tolerates error payloads)
+            df = pd.read_csv(io.BytesIO(r.content), usecols=lambda c: c in ('close', 'adjusted_close'))
             if not df.empty and 'close' in df.columns and df['close'].notna().any():
                 return float(pd.to_numeric(df['close'], errors='coerce').dropna().iloc[0])
             if not df.empty and 'adjusted_close' in df.columns and df['adjusted_close'].notna().any():
@@ -160,90 +129,105 @@ def _last_price_from_history(tk: yf.Ticker, ticker: str) -> Optional[float]:
 
 # ---------------- Main: get options data ----------------
 
+_CHAIN_COLS = ["strike", "lastPrice", "volume", "openInterest", "impliedVolatility"]
+
+
+def _safe_chain(tk, expiry):
+    try:
+        return tk.option_chain(expiry)
+    except Exception:
+        return None
+
+
+@cached(ttl_seconds=15 * 60, memory_ttl=60)
 def get_options_data(ticker: str, expiries: int = 1) -> Dict[str, Any]:
     try:
-        tk = yf.Ticker(ticker)
+        tk = yf_ticker(ticker)
         last_price = _last_price_from_history(tk, ticker)
         if last_price is None:
-            return OptionsDataOut(ticker=ticker, error="No underlying price").model_dump()
+            return OptionsDataOut(ticker=ticker, error="No underlying price").model_dump(mode="json")
 
         all_exp = tk.options or []
         if not all_exp:
-            return OptionsDataOut(ticker=ticker, underlying_price=last_price, options=[]).model_dump()
+            return OptionsDataOut(ticker=ticker, underlying_price=last_price, options=[]).model_dump(mode="json")
+
+        out: List[Dict[str, Any]] = []
+        now_utc = pd.Timestamp.now(tz="UTC")
+        # Each option_chain call is a blocking round-trip; fetch all expiries at once
+        exp_list = list(all_exp[: max(expiries, 1)])
+        with ThreadPoolExecutor(max_workers=min(8, len(exp_list))) as ex:
+            chains = dict(zip(exp_list, ex.map(lambda e: _safe_chain(tk, e), exp_list)))
+        if all(chain is None for chain in chains.values()):
+            # Every fetch failed (rate limit, network): an error, not an empty chain, so it isn't cached
+            return OptionsDataOut(ticker=ticker, underlying_price=last_price,
+                                  error="Option chain fetch failed for all expiries").model_dump(mode="json")
+
+        for expiry, chain in chains.items():
+            if chain is None:
+                continue
 
-        out: List[OptionContract] = []
-        for expiry in all_exp[: max(expiries, 1)]:
+            # Time to expiry in years (min 1 trading day), handle tz-naive/aware safely
             try:
-                chain = tk.option_chain(expiry)
+                exp_ts = pd.to_datetime(expiry, utc=True)
             except Exception:
-                continue
+                exp_ts = pd.to_datetime(expiry, errors="coerce")
+                if exp_ts.tzinfo is None:
+                    exp_ts = exp_ts.tz_localize("UTC")
+            days_to_exp = (exp_ts - now_utc).total_seconds() / 86400.0
+            if not np.isfinite(days_to_exp):
+                days_to_exp = 1.0
+            days_to_exp = max(days_to_exp, 1.0)  # at least 1 day
+            T = days_to_exp / 365.0
+            sqrtT = math.sqrt(T)
+
             for kind, df in [("call", getattr(chain, 'calls', None)), ("put", getattr(chain, 'puts', None))]:
                 if df is None or df.empty:
                     continue
-                df = df.copy()
+                # Project to the fields we use; the slice is a new frame, so no copy() needed
+                df = df.loc[:, [c for c in _CHAIN_COLS if c in df.columns]]
                 # Normalize expected fields
-                for col in ["impliedVolatility", "lastPrice", "volume", "openInterest", "strike"]:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors="coerce")
+                df = df.apply(pd.to_numeric, errors="coerce")
                 df = df.rename(columns={"impliedVolatility": "iv"})
-                # Rank by OI (top 15 per side/expiry)
-                try:
-                    df = df.sort_values("openInterest", ascending=False).head(15)
-                except Exception:
+                # Rank by OI (top 15 per side/expiry): partial select, then order just those rows
+                if "openInterest" in df.columns:
+                    oi = np.nan_to_num(df["openInterest"].to_numpy(dtype=np.float64), nan=-1.0)
+                    idx = np.argpartition(-oi, min(15, len(oi)) - 1)[:15]
+                    df = df.iloc[idx[np.argsort(-oi[idx], kind="stable")]]
+                else:
                     df = df.head(15)
 
-                # Time to expiry in years (min 1 trading day), handle tz-naive/aware safely
-                try:
-                    exp_ts = pd.to_datetime(expiry, utc=True)
-                except Exception:
-                    exp_ts = pd.to_datetime(expiry, errors="coerce")
-                    if exp_ts.tzinfo is None:
-                        exp_ts = exp_ts.tz_localize("UTC")
-                now_utc = pd.Timestamp.now(tz="UTC")
-                days_to_exp = (exp_ts - now_utc).total_seconds() / 86400.0
-                if not np.isfinite(days_to_exp):
-                    days_to_exp = 1.0
-                days_to_exp = max(days_to_exp, 1.0)  # at least 1 day
-                T = days_to_exp / 365.0
-
-                for _, r in df.iterrows():
-                    strike = float(r.get("strike")) if pd.notna(r.get("strike")) else None
-                    iv = float(r.get("iv")) if pd.notna(r.get("iv")) and r.get("iv") > 0 else None
-                    last = float(r.get("lastPrice")) if pd.notna(r.get("lastPrice")) else None
-                    vol = int(r.get("volume")) if pd.notna(r.get("volume")) else None
-                    oi = int(r.get("openInterest")) if pd.notna(r.get("openInterest")) else None
-
-                    if strike is None:
+                # Pull each column out once; Greeks for the whole side in one vectorized call
+                nan = np.full(len(df), np.nan)
+                K, iv, last, vol, oi = (
+                    df[c].to_numpy(dtype=np.float64) if c in df.columns else nan
+                    for c in ("strike", "iv", "lastPrice", "volume", "openInterest")
+                )
+                if HAVE_NUMBA:
+                    delta, pop = _bs_kernels()[1](float(last_price), K, iv, T, sqrtT, 1.0 if kind == "call" else -1.0)
+                else:
+                    delta, pop = _greeks(last_price, K, iv, T, sqrtT, kind == "call")
+
+                for k, v, lp, vo, o, d, p in zip(K, iv, last, vol, oi, delta, pop):
+                    if np.isnan(k):
                         continue
-
-                    if iv and iv > 0 and iv < 5.0:
-                        if kind == "call":
-                            delta = _delta_call(last_price, strike, iv, T)
-                            pop = _pop_itm_call(last_price, strike, iv, T)
-                        else:
-                            delta = _delta_put(last_price, strike, iv, T)
-                            pop = _pop_itm_put(last_price, strike, iv, T)
-                    else:
-                        delta = None
-                        pop = None
-
-                    out.append(
-                        OptionContract(
-                            expiry=str(expiry),
-                            type=kind,
-                            strike=float(strike),
-                            last=last,
-                            volume=vol,
-                            openInterest=oi,
-                            iv=iv,
-                            delta=delta,
-                            pop_itm=pop,
-                        )
-                    )
-
-        return OptionsDataOut(ticker=ticker, underlying_price=last_price, options=out).model_dump()
+                    # Rows are emitted as OptionContract-shaped dicts; no model per contract.
+                    # Missing quotes/greeks are left out (exclude_none) instead of sent as nulls.
+                    row = {
+                        "expiry": str(expiry),
+                        "type": kind,
+                        "strike": float(k),
+                        "last": _num(lp),
+                        "volume": None if np.isnan(vo) else int(vo),
+                        "openInterest": None if np.isnan(o) else int(o),
+                        "iv": float(v) if v > 0 else None,
+                        "delta": _num(d),
+                        "pop_itm": _num(p),
+                    }
+                    out.append({key: val for key, val in row.items() if val is not None})
+
+        return {**OptionsDataOut(ticker=ticker, underlying_price=last_price).model_dump(mode="json"), "options": out}
     except Exception as e:
-        return OptionsDataOut(ticker=ticker, error=str(e)).model_dump()
+        return OptionsDataOut(ticker=ticker, error=str(e)).model_dump(mode="json")
 
 
 if __name__ == "__main__":
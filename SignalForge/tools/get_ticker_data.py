@@ -1,13 +1,17 @@
 import os
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from typing import Dict, Any
 
 # Support both package and script execution
 try:
-    from .schemas import TickerDataOut, OHLCVRow
+    from .schemas import TickerDataOut
+    from .cache import cached
+    from .utils_http import normalize_hist, yf_ticker
 except ImportError:  # running as a script from tools/
-    from schemas import TickerDataOut, OHLCVRow
+    from schemas import TickerDataOut
+    from cache import cached
+    from utils_http import normalize_hist, yf_ticker
 
 
 def _debug(msg: str):
@@ -15,41 +19,7 @@ def _debug(msg: str):
         print(f"[get_ticker_data] {msg}")
 
 
-def _normalize_hist(df: pd.DataFrame) -> pd.DataFrame:
-    # yfinance may return columns like 'Open', 'Close', etc., sometimes as a MultiIndex
-    if df is None or df.empty:
-        return pd.DataFrame()
-
-    df = df.reset_index()
-
-    # If yfinance returns MultiIndex columns (e.g., ('Close','AAPL')), flatten to first level
-    if isinstance(df.columns, pd.MultiIndex):
-        new_cols = []
-        for col in df.columns:
-            try:
-                left = str(col[0]).lower()
-            except Exception:
-                left = str(col).lower()
-            # Normalize a few common variants on the left level
-            if left == 'adj close':
-                new_cols.append('adj_close')
-            elif left in ('date', 'datetime'):
-                new_cols.append('date')
-            else:
-                new_cols.append(left)
-        df.columns = new_cols
-    else:
-        df.columns = [str(c).lower() for c in df.columns]
-
-    # Map common single-level names
-    if 'adj close' in df.columns:
-        df = df.rename(columns={'adj close': 'adj_close'})
-    if 'datetime' in df.columns and 'date' not in df.columns:
-        df = df.rename(columns={'datetime': 'date'})
-
-    return df
-
-
+@cached(ttl_seconds=15 * 60, memory_ttl=60)
 def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Dict[str, Any]:
     """
     Robust OHLCV fetch with multiple fallbacks:
@@ -58,6 +28,7 @@ def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Di
       3) retry with shorter period/standard interval (6mo/1d)
     Emits helpful debug logs when SIGNALFORGE_DEBUG is set.
     """
+    import yfinance as yf  # deferred so importing the tool stays cheap
     try:
         hist = None
         # Attempt 1: yf.download
@@ -72,7 +43,7 @@ def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Di
         if hist is None or hist.empty:
             try:
                 _debug(f"Fallback to Ticker.history ticker={ticker} period={period} interval={interval}")
-                tk = yf.Ticker(ticker)
+                tk = yf_ticker(ticker)
                 hist = tk.history(period=period, interval=interval, auto_adjust=True)
                 _debug(f"Ticker.history returned shape={None if hist is None else hist.shape}")
             except Exception as e:
@@ -88,18 +59,11 @@ def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Di
                 _debug(f"second fallback error: {e}")
 
         if hist is None or hist.empty:
-            return TickerDataOut(ticker=ticker, error="No OHLCV from yfinance (all attempts)").dict()
+            return TickerDataOut(ticker=ticker, error="No OHLCV from yfinance (all attempts)").model_dump(mode="json")
 
-        df = _normalize_hist(hist)
+        df = normalize_hist(hist)
         # Enforce numeric types and make sure we actually have usable closes
         if not df.empty:
-            # Ensure expected columns exist
-            if "datetime" in df.columns and "date" not in df.columns:
-                df = df.rename(columns={"datetime": "date"})
-            # Cast numerics
-            for c in ["open", "high", "low", "close", "adj_close", "volume"]:
-                if c in df.columns:
-                    df[c] = pd.to_numeric(df[c], errors="coerce")
             # If close is missing or empty, derive from adj_close
             if ("close" not in df.columns) or ("close" in df.columns and df["close"].isna().all()):
                 if "adj_close" in df.columns and df["adj_close"].notna().any():
@@ -107,45 +71,44 @@ def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Di
             # If we still have no 'close' column, bail early with a clear error
             if "close" not in df.columns:
                 _debug(f"No 'close' column present after normalization. Columns={list(df.columns)}")
-                return TickerDataOut(ticker=ticker, error="No close column after normalization").dict()
+                return TickerDataOut(ticker=ticker, error="No close column after normalization").model_dump(mode="json")
             before = len(df)
             df = df.dropna(subset=["close"]).reset_index(drop=True)
             after = len(df)
             _debug(f"numeric cast done; dropped_no_close={before-after}; remaining={len(df)}")
         if df.empty:
-            return TickerDataOut(ticker=ticker, error="Downloaded frame empty after normalization").dict()
-
-        rows = []
-        skipped = 0
-        for r in df.itertuples(index=False):
-            try:
-                close_val = getattr(r, "close", None)
-                if close_val is None or pd.isna(close_val):
-                    skipped += 1
-                    continue
-                open_val = getattr(r, "open", None)
-                high_val = getattr(r, "high", None)
-                low_val  = getattr(r, "low", None)
-                vol_val  = getattr(r, "volume", None)
-                adj_val  = getattr(r, "adj_close", None) if hasattr(r, "adj_close") else None
-
-                rows.append(OHLCVRow(
-                    date=pd.to_datetime(getattr(r, "date", None) or getattr(r, "index", None)),
-                    open=float(open_val) if open_val is not None and not pd.isna(open_val) else float(close_val),
-                    high=float(high_val) if high_val is not None and not pd.isna(high_val) else float(close_val),
-                    low=float(low_val) if low_val is not None and not pd.isna(low_val) else float(close_val),
-                    close=float(close_val),
-                    adj_close=float(adj_val) if adj_val is not None and not pd.isna(adj_val) else None,
-                    volume=float(vol_val) if vol_val is not None and not pd.isna(vol_val) else 0.0,
-                ))
-            except Exception:
-                skipped += 1
-                continue
-        _debug(f"Built {len(rows)} OHLCV rows (skipped={skipped})")
+            return TickerDataOut(ticker=ticker, error="Downloaded frame empty after normalization").model_dump(mode="json")
+
+        # Rows need a date; closes are already non-null from the dropna above
+        df["date"] = pd.to_datetime(df["date"], errors="coerce") if "date" in df.columns else pd.NaT
+        df = df.dropna(subset=["date"])
+
+        # Fill columns once as arrays: missing open/high/low fall back to close, volume to 0
+        close = df["close"].to_numpy(dtype=np.float64)
+        def _col(c, fill):
+            if c not in df.columns:
+                return fill.copy()
+            col = df[c].to_numpy(dtype=np.float64)
+            return np.where(np.isnan(col), fill, col)
+        open_, high, low = _col("open", close), _col("high", close), _col("low", close)
+        vol = np.nan_to_num(df["volume"].to_numpy(dtype=np.float64), nan=0.0) if "volume" in df.columns else np.zeros(len(df))
+
+        # Rows are emitted as OHLCVRow-shaped dicts (JSON dates) without a model per row.
+        # Like model_dump(exclude_none=True), a missing adj_close is omitted rather than sent as null.
+        rows = [
+            {"date": d.isoformat(), "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(df["date"], open_.tolist(), high.tolist(), low.tolist(),
+                                        close.tolist(), vol.tolist())
+        ]
+        if "adj_close" in df.columns:
+            for r, a in zip(rows, df["adj_close"].to_numpy(dtype=np.float64).tolist()):
+                if not np.isnan(a):
+                    r["adj_close"] = a
+        _debug(f"Built {len(rows)} OHLCV rows")
 
         info = {}
         try:
-            tk = yf.Ticker(ticker)
+            tk = yf_ticker(ticker)
             ii = tk.info or {}
             info = {
                 "shortName": ii.get("shortName"),
@@ -158,12 +121,12 @@ def get_ticker_data(ticker: str, period: str = "1y", interval: str = "1d") -> Di
             info = {}
 
         if not rows:
-            return TickerDataOut(ticker=ticker, error="No parsed OHLCV rows").dict()
+            return TickerDataOut(ticker=ticker, error="No parsed OHLCV rows").model_dump(mode="json")
 
-        return TickerDataOut(ticker=ticker, ohlcv=rows, info=info).dict()
+        return {**TickerDataOut(ticker=ticker, info=info).model_dump(mode="json"), "ohlcv": rows}
 
     except Exception as e:
-        return TickerDataOut(ticker=ticker, error=str(e)).dict()
+        return TickerDataOut(ticker=ticker, error=str(e)).model_dump(mode="json")
 
 
 if __name__ == "__main__":
@@ -45,12 +45,12 @@ class OptionContract(BaseModel):
     expiry: str
     type: str  # "call" | "put"
     strike: float
-    last: Optional[float]
-    volume: Optional[int]
-    openInterest: Optional[int]
-    iv: Optional[float]
-    delta: Optional[float]
-    pop_itm: Optional[float]
+    last: Optional[float] = None
+    volume: Optional[int] = None
+    openInterest: Optional[int] = None
+    iv: Optional[float] = None
+    delta: Optional[float] = None
+    pop_itm: Optional[float] = None
 
 class OptionsDataOut(BaseModel):
     ticker: str
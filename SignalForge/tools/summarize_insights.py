@@ -1,30 +1,22 @@
-import os, json
-from typing import Dict, Any
-from openai import OpenAI
+import os, asyncio, hashlib
+import orjson
+from typing import Dict, Any, Optional
+from openai import AsyncOpenAI
 from .schemas import FinalSignalOut
+from .cache import FileCache
 from dotenv import load_dotenv
-import pandas as pd
 
 load_dotenv()
 
-_client = None
-def _client_once():
-    global _client
-    if _client is None:
-        _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    return _client
+_MODEL = "gpt-4o-mini"
+_LLM_TTL = 3600  # identical inputs within an hour reuse the previous answer
+_llm_cache = FileCache()
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
 
-def _convert(obj):
-    if isinstance(obj, dict):
-        return {k: _convert(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_convert(v) for v in obj]
-    elif isinstance(obj, pd.Timestamp):
-        return str(obj)
-    else:
-        return obj
+def _new_client() -> AsyncOpenAI:
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=30.0, max_retries=2)
 
-def summarize_insights(ticker: str, technical: Dict[str, Any], fundamentals: Dict[str, Any], options_view: Dict[str, Any], smart_money: Dict[str, Any]) -> Dict[str, Any]:
+def _prompt_body(ticker: str, technical: Dict[str, Any], fundamentals: Dict[str, Any], options_view: Dict[str, Any], smart_money: Dict[str, Any]):
     prompt = {
         "ticker": ticker,
         "guidance": [
@@ -39,24 +31,59 @@ def summarize_insights(ticker: str, technical: Dict[str, Any], fundamentals: Dic
         "options": options_view,
         "smart_money": smart_money,
     }
-    prompt = _convert(prompt)
+    # orjson handles numpy scalars/arrays natively; anything else (e.g. pd.Timestamp) falls back to str
+    body = orjson.dumps(prompt, default=str, option=_ORJSON_OPTS)
+    # The prompt is built in a fixed key order from deterministic tool output, so the
+    # serialized body itself is a stable cache key; no second sorted-keys pass needed
+    digest = {"model": _MODEL, "prompt": hashlib.sha256(body).hexdigest()}
+    return body, digest
 
-    client = _client_once()
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
+async def _complete(client: AsyncOpenAI, body: bytes) -> str:
+    resp = await client.chat.completions.create(
+        model=_MODEL,
         temperature=0.2,
+        stream=False,
         messages=[
             {"role":"system","content":"You return valid JSON only, no prose."},
-            {"role":"user","content": json.dumps(prompt)}
+            {"role":"user","content": body.decode()}
         ]
     )
-    txt = resp.choices[0].message.content.strip()
+    return resp.choices[0].message.content.strip()
+
+async def summarize_insights_async(ticker: str, technical: Dict[str, Any], fundamentals: Dict[str, Any], options_view: Dict[str, Any], smart_money: Dict[str, Any], client: Optional[AsyncOpenAI] = None) -> Dict[str, Any]:
+    """
+    Non-blocking summary; several tickers can be summarized concurrently with
+    `await asyncio.gather(*(summarize_insights_async(t, ..., client=client) for t in tickers))`.
+    Pass a shared `client` (e.g. from `async with AsyncOpenAI(...)`) to pool connections across
+    calls; without one, a client is opened and closed for this call.
+    """
+    body, digest = _prompt_body(ticker, technical, fundamentals, options_view, smart_money)
+
+    use_cache = not os.getenv("SIGNALFORGE_NO_CACHE")
+    if use_cache:
+        hit = _llm_cache.get("summarize_insights", ticker, digest, _LLM_TTL)
+        if hit is not None:
+            return hit
+
+    if client is not None:
+        txt = await _complete(client, body)
+    else:
+        async with _new_client() as own:
+            txt = await _complete(own, body)
 
     try:
-        payload = json.loads(txt)
-        return FinalSignalOut(**payload).dict()
+        payload = orjson.loads(txt)
+        out = FinalSignalOut(**payload).model_dump(mode="json")
     except Exception:
-        return FinalSignalOut(signal="Hold", confidence=60, reason=f"Parse fallback: {txt[:300]}").dict()
+        return FinalSignalOut(signal="Hold", confidence=60, reason=f"Parse fallback: {txt[:300]}").model_dump(mode="json")
+    # Only well-formed answers are cached; parse fallbacks are retried next run
+    if use_cache:
+        _llm_cache.set("summarize_insights", ticker, digest, out)
+    return out
+
+def summarize_insights(ticker: str, technical: Dict[str, Any], fundamentals: Dict[str, Any], options_view: Dict[str, Any], smart_money: Dict[str, Any]) -> Dict[str, Any]:
+    # Each asyncio.run() gets its own loop, so the client is scoped to (and closed within) the call
+    return asyncio.run(summarize_insights_async(ticker, technical, fundamentals, options_view, smart_money))
 
 if __name__ == "__main__":
     import json, sys
@@ -1,18 +1,68 @@
-import time
+import pandas as pd
 import requests
 from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from .cache import memoize
+except ImportError:  # running as a script from tools/
+    from cache import memoize
 
 DEFAULT_TIMEOUT = 15
 
-def fetch_json(url: str, params: Optional[dict]=None, headers: Optional[dict]=None, retries: int=2, timeout: int=DEFAULT_TIMEOUT) -> dict:
-    last_err = None
-    for attempt in range(retries + 1):
-        try:
-            r = requests.get(url, params=params, headers=headers, timeout=timeout)
-            if r.ok:
-                return r.json()
-            last_err = RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
-        except Exception as e:
-            last_err = e
-        time.sleep(1.5 * attempt)
-    raise last_err
+# Shared keep-alive pool: repeated calls to the same host (e.g. the FMP endpoints)
+# reuse one TCP+TLS connection instead of handshaking per request.
+# Retries are left to urllib3: exponential backoff on 429/5xx, honoring Retry-After.
+# total=2 keeps the old 3 attempts; raise_on_status=False hands the last 429/5xx response
+# back to the caller (fetch_json raises RuntimeError) instead of a RetryError.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16, pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=1.5,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",),
+                      raise_on_status=False),
+))
+
+def fetch_json(url: str, params: Optional[dict]=None, headers: Optional[dict]=None, timeout: int=DEFAULT_TIMEOUT) -> dict:
+    r = SESSION.get(url, params=params, headers=headers, timeout=timeout)
+    if not r.ok:
+        raise RuntimeError(f"HTTP {r.status_code}: {r.text[:200]}")
+    return r.json()
+
+
+_OHLCV_COLS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+def normalize_hist(df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Normalize a yfinance history/download frame: date moved into a column, names lowercased
+    ('Adj Close' -> 'adj_close', 'Datetime' -> 'date'), MultiIndex columns like ('Close', 'AAPL')
+    flattened to their first level, and OHLCV columns coerced to numbers.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+    # A plain RangeIndex carries no date, so there is nothing to move into a column
+    if not isinstance(df.index, pd.RangeIndex):
+        df = df.reset_index()
+    cols = df.columns.get_level_values(0) if isinstance(df.columns, pd.MultiIndex) else df.columns
+    cols = cols.astype(str).str.lower().str.replace(r"^adj close$", "adj_close", regex=True)
+    if "date" not in cols:
+        cols = cols.str.replace(r"^datetime$", "date", regex=True)
+    # set_axis returns a new frame, so the caller's frame is never relabelled in place
+    df = df.set_axis(cols, axis=1)
+    # yfinance columns are usually float already; only coerce the ones that are not
+    num_cols = [c for c in _OHLCV_COLS if c in df.columns and not pd.api.types.is_numeric_dtype(df[c])]
+    if num_cols:
+        df[num_cols] = df[num_cols].apply(pd.to_numeric, errors="coerce")
+    return df
+
+
+@memoize(ttl_seconds=5 * 60, maxsize=256)
+def yf_ticker(symbol: str):
+    """
+    Shared yf.Ticker per symbol. The ticker-data, options and smart-money tools all
+    reuse one object (and its lazily fetched metadata) instead of building their own.
+    """
+    import yfinance as yf  # deferred: heavy import
+    return yf.Ticker(symbol)